@@ -14,11 +14,22 @@
     Good luck!
 """
 
+import array
 from collections import defaultdict
 import datetime
-import itertools
-from typing import List,Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 
+try:
+    import numpy as np
+except ImportError:
+    # NumPy is optional: vectorized code paths are used when available, pure-Python fallbacks otherwise.
+    np = None
+
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional too: the DP kernel below is JIT-compiled when available.
+    njit = None
 
 
 class Service:
@@ -29,11 +40,21 @@ class Service:
     trip that a passenger can buy.
     """
 
+    __slots__ = ("name", "departure_date", "legs", "ods", "_itinerary_cache", "_station_index", "_leg_index", "_od_by_od")
+
+    # Current date shared by all services, so a batch run does one date lookup instead of one per day_x access
+    _today_cache: Optional[datetime.date] = None
+
     def __init__(self, name: str, departure_date: datetime.date):
         self.name = name
         self.departure_date = departure_date
         self.legs: List[Leg] = []
         self.ods: List[OD] = []
+        self._itinerary_cache: Optional[List[Station]] = None
+        self._station_index: Optional[Dict[Station, int]] = None
+        self._leg_index: Dict[Leg, int] = {}
+        # Keyed by station ids: an int-tuple hash is cheaper than invoking Station.__hash__ twice per lookup
+        self._od_by_od: Dict[Tuple[int, int], OD] = {}
 
     @property
     def day_x(self) -> int:
@@ -42,83 +63,117 @@ class Service:
         In revenue management systems, the day-x scale is often preferred because it is more convenient to manipulate
         compared to dates.
         """
-        return (datetime.date.today() - self.departure_date).days
-    
+        today = Service._today_cache
+        if today is None:
+            today = Service._today_cache = datetime.date.today()
+        return (today - self.departure_date).days
+
+    @classmethod
+    def reset_today_cache(cls) -> None:
+        """Clears the cached current date; call at the start of a report batch run."""
+        cls._today_cache = None
+
     @property
     def itinerary(self) -> List["Station"]:
-        """The ordered list of stations where the service stops."""
-        
-        return self._calculate_itinerary()
-    
+        """The ordered list of stations where the service stops.
+
+        The itinerary only changes when legs are (re)loaded, so it is computed once and memoized along with the
+        inverse station -> position map used for O(1) index lookups.
+        """
+
+        if self._itinerary_cache is None:
+            self._itinerary_cache = self._calculate_itinerary()
+            self._station_index = {station: index for index, station in enumerate(self._itinerary_cache)}
+        return self._itinerary_cache
+
     def load_passenger_manifest(self, passengers: List["Passenger"]) -> None:
         """Allocates bookings across Origin-Destination pairs (ODs) by reading a passenger manifest."""
-        
+
+        # Group bookings by OD first, then fill each OD's columns with one bulk extend per group rather than
+        # two method calls per booking
+        groups: Dict[Tuple[int, int], List[Passenger]] = defaultdict(list)
         for passenger in passengers:
-            # Find the corresponding OD for the passenger's origin-destination pair
-            od = next(od for od in self.ods if od.origin == passenger.origin and od.destination == passenger.destination)
-            od.passengers.append(passenger)
-    
+            groups[(id(passenger.origin), id(passenger.destination))].append(passenger)
+
+        for key, group in groups.items():
+            od = self._od_by_od[key]
+            od._days.extend(passenger.sale_day_x for passenger in group)
+            od._prices.extend(passenger.price for passenger in group)
+
+    def get_od(self, origin: "Station", destination: "Station") -> "OD":
+        """Returns the OD matching an origin-destination pair in O(1)."""
+        return self._od_by_od[(id(origin), id(destination))]
+
     def load_itinerary(self, itinerary: List["Station"]) -> None:
         """Loads legs and Origin-Destination (OD) pairs associated with a list of stations into the service."""
         self.load_legs(itinerary)
         self.load_ods(itinerary)
+        self._invalidate_itinerary_cache()
+
+        # Precompute the integer leg positions so leg/OD intersections reduce to index-range comparisons
+        self._leg_index = {leg: index for index, leg in enumerate(self.legs)}
 
     def load_legs(self, itinerary: List["Station"]) -> None:
         """Creates legs between consecutive stations in the itinerary and adds them to the service."""
         for station1, station2 in zip(itinerary, itinerary[1:]):
             leg = Leg(self, station1, station2)
             self.legs.append(leg)
+        self._invalidate_itinerary_cache()
+
+    def _invalidate_itinerary_cache(self) -> None:
+        """Drops the memoized itinerary and station index; called whenever legs mutate."""
+        self._itinerary_cache = None
+        self._station_index = None
 
     def load_ods(self, itinerary: List["Station"]) -> None:
-        """Creates Origin-Destination (OD) pairs between stations in the itinerary and adds them to the service."""
-        station_combinations = itertools.combinations(itinerary, 2)
-        for origin, destination in station_combinations:
-            od = OD(self, origin, destination)
-            self.ods.append(od)
+        """Creates Origin-Destination (OD) pairs between stations in the itinerary and adds them to the service.
+
+        Iterating over explicit indices rather than itertools.combinations lets each OD store its station
+        positions up front, so OD.legs never has to scan the itinerary.
+        """
+        for i in range(len(itinerary)):
+            for j in range(i + 1, len(itinerary)):
+                od = OD(self, itinerary[i], itinerary[j])
+                od._origin_idx = i
+                od._destination_idx = j
+                self.ods.append(od)
+                self._od_by_od[(id(itinerary[i]), id(itinerary[j]))] = od
     
     def _calculate_itinerary(self) -> List["Station"]:
-        """Calculate the itinerary of the service."""
-        
-        station_occurrences, station_connections = self._calculate_station_occurrences_and_connections()
-        departure, final_destination = self._find_departure_and_destination(station_occurrences, station_connections)
+        """Calculate the itinerary of the service in a single pass over the legs."""
+
+        station_connections: Dict["Station", "Station"] = {}
+        origins = set()
+        destinations = set()
+
+        for leg in self.legs:
+            station_connections[leg.origin] = leg.destination
+            origins.add(leg.origin)
+            destinations.add(leg.destination)
 
+        # The departure is the only station appearing as an origin but never as a destination; following the
+        # connections from there until a station has no successor yields the ordered itinerary
         itinerary: List[Station] = []
-        current_station = departure
+        current_station = (origins - destinations).pop()
 
-        while True:
+        while current_station is not None:
             itinerary.append(current_station)
-            if current_station == final_destination:
-                break
-            current_station = station_connections[current_station]
+            current_station = station_connections.get(current_station)
 
         return itinerary
-    
-    def _calculate_station_occurrences_and_connections(self) -> Tuple[Dict["Station", int], Dict["Station", "Station"]]:
-        """Calculate the occurrences of each station and build a map of station connections."""
-        
-        stations_occurrences= defaultdict(int)
-        station_connections: Dict["Station", "Station"] = {}
 
-        for leg in self.legs:
-            stations_occurrences[leg.origin] += 1
-            stations_occurrences[leg.destination] += 1
-            station_connections[leg.origin] = leg.destination
 
-        return stations_occurrences, station_connections
+class Station:
+    """A station is where a service can stop to let passengers board or disembark.
+
+    Stations are unique singletons within a transport plan, so equality and hashing are frozen to identity
+    semantics: dict and set operations on stations never dispatch beyond a pointer comparison.
+    """
 
-    def _find_departure_and_destination(self, station_occurrences: Dict["Station", int], station_connections: Dict["Station", "Station"]) -> Tuple["Station", "Station"]:
-        """Find the departure and destination of a service"""
-        
-        # Find the departure station by locating the origin station in station_connections where its occurrence count is 1
-        departure_station = next(origin for origin, _ in station_connections.items() if station_occurrences[origin] == 1)
-        
-        # Find the destination station by locating the destination station in station_connections where its occurrence count is 1
-        destination_station = next(destination for _, destination in station_connections.items() if station_occurrences[destination] == 1)
-        return departure_station, destination_station
-      
+    __slots__ = ("name",)
 
-class Station:
-    """A station is where a service can stop to let passengers board or disembark."""
+    __eq__ = object.__eq__
+    __hash__ = object.__hash__
 
     def __init__(self, name: str):
         self.name = name
@@ -130,6 +185,8 @@ class Leg:
     Example: a service whose itinerary is A-B-C-D has three legs: A-B, B-C and C-D.
     """
 
+    __slots__ = ("service", "origin", "destination")
+
     def __init__(self, service: Service, origin: Station, destination: Station):
         self.service = service
         self.origin = origin
@@ -137,56 +194,118 @@ class Leg:
     
     @property
     def passengers(self) -> List["Passenger"]:
-        # Retrieve passengers from all ODs associated with this leg and remove duplicates if any using a set 
-        passengers_set = set({passenger for od in self.service.ods if self in od.legs for passenger in od.passengers})
-        return list(passengers_set)
+        """Returns passengers occupying a seat on this leg.
+
+        An OD crosses this leg when the leg index falls within its precomputed station index range. ODs partition
+        passengers by their origin-destination pair, so no deduplication is needed.
+        """
+        # Bind everything reachable through self once: the loop body then only touches local variables
+        service = self.service
+        ods = service.ods
+        leg_index = service._leg_index[self]
+        return [
+            passenger
+            for od in ods
+            if od._origin_idx <= leg_index < od._destination_idx
+            for passenger in od.passengers
+        ]
 
 
 class OD:
     """An Origin-Destination (OD) represents the transportation facility between two stops, bought by a passenger.
 
     Example: a service whose itinerary is A-B-C-D has up to six ODs: A-B, A-C, A-D, B-C, B-D and C-D.
+
+    Invariant: ODs are uniquely keyed by their (origin, destination) pair and each booking is allocated to
+    exactly one OD, so the passengers of two ODs never overlap. Consumers such as Leg.passengers rely on this
+    to aggregate without deduplication.
     """
 
+    __slots__ = ("service", "origin", "destination", "_days", "_prices", "_origin_idx", "_destination_idx")
+
     def __init__(self, service: Service, origin: Station, destination: Station):
         self.service = service
         self.origin = origin
         self.destination = destination
-        self.passengers: List[Passenger] = []
+        # Bookings are stored as two parallel columns (sale day, price) instead of a list of Passenger
+        # objects: no pointer chasing in history(), and numeric buffers NumPy can consume directly
+        self._days = array.array("i")
+        self._prices = array.array("d")
+        self._origin_idx: Optional[int] = None
+        self._destination_idx: Optional[int] = None
+
+    @property
+    def passengers(self) -> List["Passenger"]:
+        """Returns the bookings of this OD, materialized as Passenger objects from the columnar buffers."""
+        return [
+            Passenger(self.origin, self.destination, sale_day_x, price)
+            for sale_day_x, price in zip(self._days, self._prices)
+        ]
 
     @property
     def legs(self):
-        """Returns the list of legs between the origin and destination stations."""
-        itinerary = self.service.itinerary
-        origin_index = itinerary.index(self.origin)
-        destination_index = itinerary.index(self.destination)
-        return self.service.legs[origin_index:destination_index]
+        """Returns the list of legs between the origin and destination stations.
+
+        The station positions are precomputed when the itinerary is loaded, so this is a plain O(1) slice with
+        no itinerary scan.
+        """
+        return self.service.legs[self._origin_idx:self._destination_idx]
     
     def history(self):
         """Generates a report about sales made each day."""
-        
-        history_map = defaultdict(lambda: [0, 0.0])
 
-        for passenger in self.passengers:
-            # Update the cumulative bookings and revenue for the sale day of the passenger
-            history_map[passenger.sale_day_x][0] += 1
-            history_map[passenger.sale_day_x][1] += passenger.price
+        if not self._days:
+            return []
+        if np is not None:
+            return self._history_numpy()
+
+        # Accumulate bookings and revenue per sale day in two parallel maps rather than a dict of
+        # [count, revenue] lists: no 2-element list allocation per day, one dict indexing per update
+        bookings = defaultdict(int)
+        revenue = defaultdict(float)
+        for sale_day_x, price in zip(self._days, self._prices):
+            bookings[sale_day_x] += 1
+            revenue[sale_day_x] += price
+
+        history_list = [[sale_day_x, bookings[sale_day_x], revenue[sale_day_x]] for sale_day_x in sorted(bookings)]
 
-        # Sort the history_map by sale day and convert it to a list of lists
-        history_list = sorted([[sale_day_x, info[0], info[1]] for sale_day_x, info in history_map.items()])
-        
         # Calculate cumulative bookings and revenue for each sale_day
         for i in range(1,len(history_list)):
-            history_list[i][1] += history_list[i-1][1] 
-            history_list[i][2] += history_list[i-1][2] 
+            history_list[i][1] += history_list[i-1][1]
+            history_list[i][2] += history_list[i-1][2]
 
         return history_list
-        
-        
-        
-    
+
+    def _history_numpy(self):
+        """Vectorized history: bincount sales per day, then take cumulative sums at C speed."""
+
+        days = np.frombuffer(self._days, dtype=np.intc)
+        prices = np.frombuffer(self._prices, dtype=np.float64)
+
+        # Shift days so the earliest sale day maps to bin 0
+        first_day = int(days.min())
+        shifted = days - first_day
+        bookings = np.bincount(shifted)
+        revenue = np.bincount(shifted, weights=prices)
+
+        # Keep only the days with at least one sale, after accumulating over all bins
+        sale_days = np.nonzero(bookings)[0]
+        cumulative_bookings = np.cumsum(bookings)[sale_days]
+        cumulative_revenue = np.cumsum(revenue)[sale_days]
+
+        return [
+            [int(day) + first_day, int(count), float(total)]
+            for day, count, total in zip(sale_days, cumulative_bookings, cumulative_revenue)
+        ]
+
+
 class Passenger:
-    """A passenger that has a booking on a seat for a particular origin-destination."""
+    """A passenger that has a booking on a seat for a particular origin-destination.
+
+    Manifests can hold millions of bookings, so instances are slotted to halve their memory footprint.
+    """
+
+    __slots__ = ("origin", "destination", "sale_day_x", "price")
 
     def __init__(self, origin: Station, destination: Station, sale_day_x: int, price: float):
         self.origin = origin
@@ -234,9 +353,9 @@ assert service.legs[0].destination == lpd
 assert service.legs[1].origin == lpd
 assert service.legs[1].destination == msc
 assert len(service.ods) == 3
-od_ply_lpd = next(od for od in service.ods if od.origin == ply and od.destination == lpd)
-od_ply_msc = next(od for od in service.ods if od.origin == ply and od.destination == msc)
-od_lpd_msc = next(od for od in service.ods if od.origin == lpd and od.destination == msc)
+od_ply_lpd = service.get_od(ply, lpd)
+od_ply_msc = service.get_od(ply, msc)
+od_lpd_msc = service.get_od(lpd, msc)
 
 # 4. Create a method in `Service` class that reads a passenger manifest (a list of all bookings made for this service)
 # and that allocates bookings across ODs. When called, it should fill the `passengers` attribute of each OD instances
@@ -281,19 +400,21 @@ assert history[2] == [-20, 4, 130]
 # matrix = 1 1 8 
 #          3 2 1
 
-def path_finder(dp: List[List[int]]) -> List[Tuple[int, int]]:
-    """Finds the path based on a dp table."""
-    
-    n, m = len(dp), len(dp[0])
+def path_finder(came_from, n: int, m: int) -> List[Tuple[int, int]]:
+    """Reconstructs the optimal path from the directions recorded during the DP forward pass.
+
+    came_from is a flat row-major buffer of n*m flags: 1 if the best move into a cell came from the top,
+    0 if it came from the left. No value comparisons are repeated here.
+    """
+
     row, col = n - 1, m - 1
     path = []
-    
-    
-    # If there is a row above and either no column left ( initial position) or the value above is greater or equal to the value to the left,
-    # move up (decrement row); otherwise, move left (decrement col).
-    while row >= 0 and col >= 0:
+
+    while True:
         path.append((row, col))
-        if row > 0 and (col == 0 or dp[row - 1][col] >= dp[row][col - 1]):
+        if row == 0 and col == 0:
+            break
+        if came_from[row * m + col]:
             row -= 1
         else:
             col -= 1
@@ -301,28 +422,98 @@ def path_finder(dp: List[List[int]]) -> List[Tuple[int, int]]:
     path.reverse()
     return path
 
-def max_path_finder(grid : List[List[int]]):
-        n,m = len(grid),len(grid[0])
-        dp = [[0] * m for _ in range(n)]
-        dp[0][0] = grid[0][0]
-        
-        for row in range(n):
-            for col in range(m):
-                # skip the starting point
-                if row+col == 0: continue
-                ans = float("-inf")
-                
-                # determine the maximum value between the top and left directions
-                if row >0:
-                    ans= max( ans,dp[row-1][col])
-                if col >0:
-                    ans = max( ans,dp[row][col-1])
-                
-                # Update the current cell with the maximum value plus the current value from the grid
-                dp[row][col] = grid[row][col] + ans
-
-        path = path_finder(dp)
-        return dp[n-1][m-1],path
+def _max_path_dp_python(grid: List[List[int]]) -> Tuple[int, bytearray]:
+    """Pure-Python DP computation, used when NumPy is not available.
+
+    The table is padded with one row and column of zeros so the borders need no row > 0 / col > 0 branches:
+    since grid values are strictly positive, a zero pad never wins a max() against a real neighbour.
+    The table lives in a single flat row-major buffer rather than a list of row lists, keeping the top and
+    left neighbours of a cell exactly one stride apart in one contiguous allocation.
+    Returns the maximum path value and the came-from flags for path reconstruction.
+    """
+    n, m = len(grid), len(grid[0])
+    width = m + 1
+    dp = array.array("q", bytes(8 * (n + 1) * width))  # zero-initialized
+    came_from = bytearray(n * m)
+
+    for row in range(1, n + 1):
+        grid_row = grid[row - 1]
+        base = row * width
+        above = base - width
+        flag_base = (row - 1) * m - 1
+        for col in range(1, m + 1):
+            up = dp[above + col]
+            left = dp[base + col - 1]
+            if up >= left:
+                dp[base + col] = grid_row[col - 1] + up
+                came_from[flag_base + col] = 1
+            else:
+                dp[base + col] = grid_row[col - 1] + left
+
+    return dp[n * width + m], came_from
+
+def _max_path_dp_kernel(grid):
+    """DP table computation as plain nested loops over a NumPy array.
+
+    JIT-compiled with Numba when available: the branch-free inner loop lowers to a tight native loop, which beats
+    the anti-diagonal NumPy sweep on the large estimated demand matrices of question 7.
+    """
+    n, m = grid.shape
+    dp = np.empty((n, m), dtype=np.int64)
+    came_from = np.zeros(n * m, dtype=np.uint8)
+    dp[0, 0] = grid[0, 0]
+    for col in range(1, m):
+        dp[0, col] = dp[0, col - 1] + grid[0, col]
+    for row in range(1, n):
+        dp[row, 0] = dp[row - 1, 0] + grid[row, 0]
+        came_from[row * m] = 1
+        for col in range(1, m):
+            up = dp[row - 1, col]
+            left = dp[row, col - 1]
+            if up >= left:
+                dp[row, col] = up + grid[row, col]
+                came_from[row * m + col] = 1
+            else:
+                dp[row, col] = left + grid[row, col]
+    return dp[n - 1, m - 1], came_from
+
+if njit is not None:
+    _max_path_dp_kernel = njit(cache=True)(_max_path_dp_kernel)
+
+def _max_path_dp_numpy(grid: "np.ndarray") -> Tuple[int, "np.ndarray"]:
+    """Vectorized DP computation: one np.maximum per anti-diagonal instead of a Python loop per cell."""
+    n, m = grid.shape
+    dp = np.empty((n, m), dtype=np.int64)
+    dp[0, :] = np.cumsum(grid[0, :])
+    dp[:, 0] = np.cumsum(grid[:, 0])
+    came_from = np.zeros((n, m), dtype=np.uint8)
+    came_from[1:, 0] = 1
+
+    # Cells on the anti-diagonal row+col == k only depend on diagonals k-1, so each one is a single vector op
+    for k in range(2, n + m - 1):
+        rows = np.arange(max(1, k - m + 1), min(n - 1, k - 1) + 1)
+        if rows.size == 0:
+            continue
+        cols = k - rows
+        up = dp[rows - 1, cols]
+        left = dp[rows, cols - 1]
+        from_top = up >= left
+        dp[rows, cols] = grid[rows, cols] + np.where(from_top, up, left)
+        came_from[rows, cols] = from_top
+
+    return dp[n - 1, m - 1], came_from.ravel()
+
+def max_path_finder(grid: List[List[int]]):
+    """Returns the maximum revenue path through the demand matrix, and its value."""
+    n, m = len(grid), len(grid[0])
+    if np is not None and njit is not None:
+        max_value, came_from = _max_path_dp_kernel(np.asarray(grid, dtype=np.int64))
+    elif np is not None:
+        max_value, came_from = _max_path_dp_numpy(np.asarray(grid, dtype=np.int64))
+    else:
+        max_value, came_from = _max_path_dp_python(grid)
+
+    return int(max_value), path_finder(came_from, n, m)
 
 
 